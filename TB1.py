@@ -1,16 +1,48 @@
- from abc import ABC, abstractmethod
+from abc import ABC, abstractmethod
+from array import array
+from collections import Counter
 from datetime import datetime
-from enum import Enum
+from functools import reduce
+from operator import or_
+import random
+import time
+import warnings
+from enum import Enum, IntFlag
 from typing import List, Dict, Optional
 
-class TipoDefecto(Enum):
-    """Enumeración de tipos de defectos posibles"""
-    BURBUJAS = "burbujas_aire"
-    ROTURA = "rotura"
-    FORMA_INCORRECTA = "forma_incorrecta"
-    MANCHAS = "manchas"
-    FALTANTE = "pieza_faltante"
-    EMPAQUE_DANADO = "empaque_danado"
+# Dependencias opcionales para acelerar la simulación en lote
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+class TipoDefecto(IntFlag):
+    """Enumeración de tipos de defectos posibles (un bit por defecto)"""
+    BURBUJAS = 1 << 0
+    ROTURA = 1 << 1
+    FORMA_INCORRECTA = 1 << 2
+    MANCHAS = 1 << 3
+    FALTANTE = 1 << 4
+    EMPAQUE_DANADO = 1 << 5
+
+    @property
+    def descripcion(self) -> str:
+        """Nombre legible del defecto para reportes"""
+        return DESCRIPCION_DEFECTO[self]
+
+DESCRIPCION_DEFECTO: Dict[TipoDefecto, str] = {
+    TipoDefecto.BURBUJAS: "burbujas_aire",
+    TipoDefecto.ROTURA: "rotura",
+    TipoDefecto.FORMA_INCORRECTA: "forma_incorrecta",
+    TipoDefecto.MANCHAS: "manchas",
+    TipoDefecto.FALTANTE: "pieza_faltante",
+    TipoDefecto.EMPAQUE_DANADO: "empaque_danado",
+}
 
 class EstadoCalidad(Enum):
     """Enumeración de estados de calidad"""
@@ -18,13 +50,27 @@ class EstadoCalidad(Enum):
     RECHAZADO = "rechazado"
     PENDIENTE = "pendiente"
 
+# Identificador compacto (uint8) de cada estado para el registro de resultados
+_ESTADOS = tuple(EstadoCalidad)
+_ESTADO_ID: Dict[EstadoCalidad, int] = {estado: i for i, estado in enumerate(_ESTADOS)}
+
+# Valores precalculados para no repetir accesos a .value en los recorridos
+APROBADO_ID, RECHAZADO_ID = _ESTADO_ID[EstadoCalidad.APROBADO], _ESTADO_ID[EstadoCalidad.RECHAZADO]
+APROBADO_STR, RECHAZADO_STR = EstadoCalidad.APROBADO.value, EstadoCalidad.RECHAZADO.value
+_VALOR_ESTADO = tuple(estado.value for estado in _ESTADOS)
+# Texto de defectos para cada máscara posible (índice = máscara)
+_TEXTO_DEFECTOS = tuple(", ".join(DESCRIPCION_DEFECTO[d] for d in TipoDefecto if mascara & d)
+                        for mascara in range(1 << len(TipoDefecto)))
+
 class Chocolate:
     """Clase base que representa un chocolate con sus atributos básicos"""
     
+    __slots__ = ('_lote_id', '_fecha_produccion', '_defectos_mask', '_estado_calidad')
+    
     def __init__(self, lote_id: str, fecha_produccion: datetime):
         self._lote_id = lote_id  # Encapsulamiento: atributo protegido
         self._fecha_produccion = fecha_produccion
-        self._defectos: List[TipoDefecto] = []
+        self._defectos_mask = 0  # Máscara de bits de TipoDefecto (int simple)
         self._estado_calidad = EstadoCalidad.PENDIENTE
     
     @property
@@ -33,18 +79,21 @@ class Chocolate:
         return self._lote_id
     
     @property
-    def defectos(self) -> List[TipoDefecto]:
-        """Getter para defectos (encapsulamiento)"""
-        return self._defectos.copy()  # Devolver copia para evitar modificación externa
+    def defectos(self) -> TipoDefecto:
+        """Getter para defectos (máscara inmutable, no requiere copia)"""
+        return TipoDefecto(self._defectos_mask)
+    
+    def defectos_list(self) -> List[TipoDefecto]:
+        """Devuelve los defectos como lista, construida solo cuando se pide"""
+        return [d for d in TipoDefecto if self._defectos_mask & d]
     
     def agregar_defecto(self, defecto: TipoDefecto) -> None:
         """Método para agregar defectos al chocolate"""
-        if defecto not in self._defectos:
-            self._defectos.append(defecto)
+        self._defectos_mask |= int(defecto)
     
     def evaluar_calidad(self) -> EstadoCalidad:
         """Método base para evaluar calidad"""
-        if not self._defectos:
+        if not self._defectos_mask:
             self._estado_calidad = EstadoCalidad.APROBADO
         else:
             self._estado_calidad = EstadoCalidad.RECHAZADO
@@ -56,6 +105,11 @@ class Chocolate:
 class ChocolateMoldeado(Chocolate):
     """Clase para chocolates del proceso de moldeado (herencia de Chocolate)"""
     
+    __slots__ = ('_tipo_molde',)
+    
+    # Defectos que provocan rechazo en moldeado
+    REJECT_MASK = int(TipoDefecto.BURBUJAS | TipoDefecto.ROTURA | TipoDefecto.FORMA_INCORRECTA)
+    
     def __init__(self, lote_id: str, fecha_produccion: datetime, tipo_molde: str):
         super().__init__(lote_id, fecha_produccion)
         self._tipo_molde = tipo_molde  # Encapsulamiento
@@ -63,17 +117,18 @@ class ChocolateMoldeado(Chocolate):
     def evaluar_calidad(self) -> EstadoCalidad:
         """Polimorfismo: implementación específica para moldeado"""
         # Criterios específicos de moldeado
-        if (TipoDefecto.BURBUJAS in self._defectos or 
-            TipoDefecto.ROTURA in self._defectos or
-            TipoDefecto.FORMA_INCORRECTA in self._defectos):
-            self._estado_calidad = EstadoCalidad.RECHAZADO
-        else:
-            self._estado_calidad = EstadoCalidad.APROBADO
+        self._estado_calidad = (EstadoCalidad.RECHAZADO if self._defectos_mask & self.REJECT_MASK
+                                else EstadoCalidad.APROBADO)
         return self._estado_calidad
 
 class ChocolateEmpaque(Chocolate):
     """Clase para chocolates del proceso de empaque (herencia de Chocolate)"""
     
+    __slots__ = ('_tipo_empaque',)
+    
+    # Defectos que provocan rechazo en empaque
+    REJECT_MASK = int(TipoDefecto.ROTURA | TipoDefecto.EMPAQUE_DANADO | TipoDefecto.FALTANTE)
+    
     def __init__(self, lote_id: str, fecha_produccion: datetime, tipo_empaque: str):
         super().__init__(lote_id, fecha_produccion)
         self._tipo_empaque = tipo_empaque
@@ -81,110 +136,184 @@ class ChocolateEmpaque(Chocolate):
     def evaluar_calidad(self) -> EstadoCalidad:
         """Polimorfismo: implementación específica para empaque"""
         # Criterios específicos de empaque
-        if (TipoDefecto.ROTURA in self._defectos or 
-            TipoDefecto.EMPAQUE_DANADO in self._defectos or
-            TipoDefecto.FALTANTE in self._defectos):
-            self._estado_calidad = EstadoCalidad.RECHAZADO
-        else:
-            self._estado_calidad = EstadoCalidad.APROBADO
+        self._estado_calidad = (EstadoCalidad.RECHAZADO if self._defectos_mask & self.REJECT_MASK
+                                else EstadoCalidad.APROBADO)
         return self._estado_calidad
 
 class SensorCalidad(ABC):
     """Clase abstracta para sensores de calidad (abstracción)"""
     
     @abstractmethod
-    def detectar_defectos(self, chocolate: Chocolate) -> List[TipoDefecto]:
-        """Método abstracto para detección de defectos"""
+    def detectar_defectos(self, chocolate: Chocolate) -> int:
+        """Método abstracto para detección de defectos (máscara de bits de TipoDefecto)"""
         pass
+    
+    def detectar_defectos_batch(self, tipo_chocolate: type, n: int):
+        """Detección en lote: array uint8 con las máscaras de n chocolates, o None si no se soporta"""
+        return None
 
 class SensorVisual(SensorCalidad):
     """Sensor visual para detección de defectos (implementación concreta)"""
     
-    def detectar_defectos(self, chocolate: Chocolate) -> List[TipoDefecto]:
+    # Defectos que el sensor puede detectar en cada proceso (bits como int simple)
+    _DEFECTOS_MOLDEADO = tuple(map(int, (TipoDefecto.BURBUJAS, TipoDefecto.ROTURA,
+                                         TipoDefecto.FORMA_INCORRECTA, TipoDefecto.MANCHAS)))
+    _DEFECTOS_EMPAQUE = tuple(map(int, (TipoDefecto.ROTURA, TipoDefecto.EMPAQUE_DANADO,
+                                        TipoDefecto.FALTANTE)))
+    # Máximo de defectos detectados por chocolate en cada proceso
+    _MAX_DEFECTOS_MOLDEADO = 2
+    _MAX_DEFECTOS_EMPAQUE = 1
+    # Los mismos candidatos como arrays de bits para la detección en lote (requieren numpy)
+    _BITS_MOLDEADO = np.array(_DEFECTOS_MOLDEADO, dtype=np.uint8) if np is not None else None
+    _BITS_EMPAQUE = np.array(_DEFECTOS_EMPAQUE, dtype=np.uint8) if np is not None else None
+    # Miembros que el sorteo en lote reproduce; si una subclase redefine alguno, no se usa
+    _MIEMBROS_BATCH = ('detectar_defectos', '_analizar_moldeado', '_analizar_empaque',
+                       '_DEFECTOS_MOLDEADO', '_DEFECTOS_EMPAQUE',
+                       '_MAX_DEFECTOS_MOLDEADO', '_MAX_DEFECTOS_EMPAQUE')
+    
+    def __init__(self):
+        # Análisis específico según la clase de chocolate
+        self._dispatch = {
+            ChocolateMoldeado: self._analizar_moldeado,
+            ChocolateEmpaque: self._analizar_empaque,
+        }
+        # Generador de numpy para la detección en lote (si está disponible)
+        self._rng = np.random.default_rng() if np is not None else None
+        self._batch = {
+            ChocolateMoldeado: (self._BITS_MOLDEADO, self._MAX_DEFECTOS_MOLDEADO),
+            ChocolateEmpaque: (self._BITS_EMPAQUE, self._MAX_DEFECTOS_EMPAQUE),
+        }
+    
+    def detectar_defectos(self, chocolate: Chocolate) -> int:
         """Simula detección de defectos mediante visión artificial"""
         # En una implementación real, aquí iría la lógica de computer vision
-        defectos_detectados = []
-        
-        # Simulación de detección (lógica de ejemplo)
-        if isinstance(chocolate, ChocolateMoldeado):
-            # Lógica específica para moldeado
-            defectos_detectados.extend(self._analizar_moldeado())
-        
-        elif isinstance(chocolate, ChocolateEmpaque):
-            # Lógica específica para empaque
-            defectos_detectados.extend(self._analizar_empaque())
+        analizar = self._dispatch.get(type(chocolate))
+        return analizar() if analizar else 0
+    
+    def detectar_defectos_batch(self, tipo_chocolate: type, n: int):
+        """Genera de una vez las máscaras de defectos (uint8) de n chocolates
         
-        return defectos_detectados
+        Devuelve None sin numpy o si una subclase cambia la detección unitaria.
+        """
+        if np is None or any(getattr(type(self), m) is not getattr(SensorVisual, m)
+                             for m in self._MIEMBROS_BATCH):
+            return None
+        if tipo_chocolate not in self._batch:
+            # Igual que detectar_defectos: sin análisis específico no hay defectos
+            return np.zeros(n, dtype=np.uint8)
+        bits, max_defectos = self._batch[tipo_chocolate]
+        # Misma distribución que el análisis unitario: k defectos al azar, con k en [0, max]
+        k = self._rng.integers(0, max_defectos + 1, size=n)
+        elegidos = bits[self._rng.integers(0, len(bits), size=(n, max_defectos))]
+        elegidos[np.arange(max_defectos) >= k[:, None]] = 0
+        return np.bitwise_or.reduce(elegidos, axis=1)
     
-    def _analizar_moldeado(self) -> List[TipoDefecto]:
+    def _analizar_moldeado(self) -> int:
         """Método privado para análisis de moldeado (encapsulamiento)"""
         # Simulación de análisis de imágenes
-        import random
-        defectos_posibles = [TipoDefecto.BURBUJAS, TipoDefecto.ROTURA, 
-                           TipoDefecto.FORMA_INCORRECTA, TipoDefecto.MANCHAS]
-        return random.choices(defectos_posibles, k=random.randint(0, 2))
+        return reduce(or_, random.choices(self._DEFECTOS_MOLDEADO,
+                                       k=random.randint(0, self._MAX_DEFECTOS_MOLDEADO)), 0)
     
-    def _analizar_empaque(self) -> List[TipoDefecto]:
+    def _analizar_empaque(self) -> int:
         """Método privado para análisis de empaque (encapsulamiento)"""
-        import random
-        defectos_posibles = [TipoDefecto.ROTURA, TipoDefecto.EMPAQUE_DANADO, 
-                           TipoDefecto.FALTANTE]
-        return random.choices(defectos_posibles, k=random.randint(0, 1))
+        return reduce(or_, random.choices(self._DEFECTOS_EMPAQUE,
+                                       k=random.randint(0, self._MAX_DEFECTOS_EMPAQUE)), 0)
 
 class SistemaControlCalidad:
     """Sistema principal que gestiona el control de calidad automatizado"""
     
     def __init__(self):
         self._sensores: Dict[str, SensorCalidad] = {}  # Encapsulamiento
-        self._resultados: List[Dict] = []
+        # Resultados por columnas: la posición i de cada columna es la inspección i
+        self._res_lote_id: List[str] = []
+        self._res_fecha = array('q')  # Epoch en nanosegundos
+        self._res_proceso = array('H')  # Índice en _procesos
+        self._res_defectos = array('B')  # Máscara de TipoDefecto
+        self._res_resultado = array('B')  # Índice en _ESTADOS
+        # Nombres de proceso almacenados una sola vez
+        self._procesos: List[str] = []
+        self._proceso_ids: Dict[str, int] = {}
     
     def registrar_sensor(self, proceso: str, sensor: SensorCalidad) -> None:
         """Registra un sensor para un proceso específico"""
         self._sensores[proceso] = sensor
     
-    def inspeccionar_chocolate(self, chocolate: Chocolate, proceso: str) -> EstadoCalidad:
-        """Realiza la inspección automática de un chocolate"""
+    def obtener_sensor(self, proceso: str) -> SensorCalidad:
+        """Devuelve el sensor registrado para un proceso"""
         if proceso not in self._sensores:
             raise ValueError(f"No hay sensor registrado para el proceso: {proceso}")
-        
-        sensor = self._sensores[proceso]
+        return self._sensores[proceso]
+    
+    def inspeccionar_chocolate(self, chocolate: Chocolate, proceso: str,
+                               ts: Optional[int] = None) -> EstadoCalidad:
+        """Realiza la inspección automática de un chocolate (ts: epoch en ns, por defecto ahora)"""
+        sensor = self.obtener_sensor(proceso)
         defectos = sensor.detectar_defectos(chocolate)
         
         # Agregar defectos detectados al chocolate
-        for defecto in defectos:
-            chocolate.agregar_defecto(defecto)
+        chocolate.agregar_defecto(defectos)
         
         # Evaluar calidad (polimorfismo: se usa la implementación específica)
         resultado = chocolate.evaluar_calidad()
         
         # Registrar resultado
-        self._registrar_resultado(chocolate, defectos, resultado, proceso)
+        self._registrar_resultado(chocolate, defectos, resultado, proceso, ts)
         
         return resultado
     
-    def _registrar_resultado(self, chocolate: Chocolate, defectos: List[TipoDefecto], 
-                           resultado: EstadoCalidad, proceso: str) -> None:
+    @staticmethod
+    def _internar(nombre: str, ids: Dict[str, int], nombres: List[str]) -> int:
+        """Devuelve el identificador de un nombre, asignándole uno nuevo si no existe"""
+        if nombre not in ids:
+            ids[nombre] = len(nombres)
+            nombres.append(nombre)
+        return ids[nombre]
+    
+    def _registrar_resultado(self, chocolate: Chocolate, defectos: int, 
+                           resultado: EstadoCalidad, proceso: str, ts: Optional[int] = None) -> None:
         """Método privado para registrar resultados (encapsulamiento)"""
-        registro = {
-            'lote_id': chocolate.lote_id,
-            'fecha': datetime.now(),
-            'proceso': proceso,
-            'defectos': [d.value for d in defectos],
-            'resultado': resultado.value,
-            'tipo_chocolate': chocolate.__class__.__name__
-        }
-        self._resultados.append(registro)
+        self._res_lote_id.append(chocolate.lote_id)
+        self._res_fecha.append(time.time_ns() if ts is None else ts)
+        self._res_proceso.append(self._internar(proceso, self._proceso_ids, self._procesos))
+        self._res_defectos.append(defectos)
+        self._res_resultado.append(_ESTADO_ID[resultado])
+    
+    def _registrar_resultados_bulk(self, lote_ids: List[str], procesos: List[str], grupo,
+                                   mascaras, aprobados, ts: Optional[int] = None) -> None:
+        """Método privado para registrar de una vez los resultados de un lote simulado
+        
+        La fila i pertenece al proceso procesos[grupo[i]].
+        """
+        n = len(lote_ids)
+        ids_proceso = np.array([self._internar(proceso, self._proceso_ids, self._procesos)
+                                for proceso in procesos], dtype=np.uint16)
+        resultados = np.where(aprobados, APROBADO_ID, RECHAZADO_ID).astype(np.uint8)
+        self._res_lote_id.extend(lote_ids)
+        self._res_fecha.extend(array('q', [time.time_ns() if ts is None else ts]) * n)
+        self._res_proceso.frombytes(ids_proceso[grupo].tobytes())
+        self._res_defectos.frombytes(np.ascontiguousarray(mascaras, dtype=np.uint8).tobytes())
+        self._res_resultado.frombytes(resultados.tobytes())
     
     def generar_reporte(self) -> str:
         """Genera un reporte de calidad"""
-        if not self._resultados:
+        if not self._res_resultado:
             return "No hay datos de inspección para generar reporte."
         
-        total_inspecciones = len(self._resultados)
-        aprobados = sum(1 for r in self._resultados if r['resultado'] == EstadoCalidad.APROBADO.value)
+        total_inspecciones = len(self._res_resultado)
+        if np is not None:
+            aprobados = int((np.frombuffer(self._res_resultado, np.uint8) == APROBADO_ID).sum())
+            # Cada columna de bits corresponde a un TipoDefecto (bit 0 = BURBUJAS, ...)
+            bits = np.unpackbits(np.frombuffer(self._res_defectos, np.uint8)[:, None],
+                                 axis=1, bitorder='little')
+            conteos = bits.sum(axis=0).tolist()
+        else:
+            aprobados = self._res_resultado.count(APROBADO_ID)
+            # Se cuenta cada máscara distinta (a lo sumo 64) y luego se reparte por bit
+            por_mascara = Counter(self._res_defectos)
+            conteos = [sum(c for m, c in por_mascara.items() if m & d) for d in TipoDefecto]
         tasa_aprobacion = (aprobados / total_inspecciones * 100) if total_inspecciones > 0 else 0
         
-        reporte = f"""
+        partes = [f"""
         REPORTE DE CONTROL DE CALIDAD
         =============================
         Total de inspecciones: {total_inspecciones}
@@ -193,40 +322,44 @@ class SistemaControlCalidad:
         Tasa de aprobación: {tasa_aprobacion:.2f}%
         
         Detalle por defectos:
-        """
+        """]
         
         # Contar defectos por tipo
-        contador_defectos = {}
-        for resultado in self._resultados:
-            for defecto in resultado['defectos']:
-                contador_defectos[defecto] = contador_defectos.get(defecto, 0) + 1
+        contador_defectos = {d: count for d, count in zip(TipoDefecto, conteos) if count}
         
         if contador_defectos:
             for defecto, count in contador_defectos.items():
-                reporte += f"  - {defecto}: {count} ocurrencias\n"
+                partes.append(f"  - {defecto.descripcion}: {count} ocurrencias\n")
         else:
-            reporte += "  No se detectaron defectos\n"
+            partes.append("  No se detectaron defectos\n")
         
-        return reporte
+        return "".join(partes)
     
     def mostrar_inspecciones(self) -> str:
         """Muestra el historial de inspecciones"""
-        if not self._resultados:
+        if not self._res_resultado:
             return "No hay inspecciones registradas."
         
-        reporte = "HISTORIAL DE INSPECCIONES\n"
-        reporte += "=" * 50 + "\n"
+        partes = ["HISTORIAL DE INSPECCIONES\n", "=" * 50, "\n"]
+        separador = "-" * 50 + "\n"
+        # Las filas de un mismo lote comparten ts: se formatea solo cuando cambia
+        ultimo_ts, fecha_texto = None, ""
         
-        for i, resultado in enumerate(self._resultados, 1):
-            reporte += f"{i}. Lote: {resultado['lote_id']} | "
-            reporte += f"Proceso: {resultado['proceso']} | "
-            reporte += f"Resultado: {resultado['resultado']}\n"
-            if resultado['defectos']:
-                reporte += f"   Defectos: {', '.join(resultado['defectos'])}\n"
-            reporte += f"   Fecha: {resultado['fecha'].strftime('%Y-%m-%d %H:%M:%S')}\n"
-            reporte += "-" * 50 + "\n"
+        for i in range(len(self._res_resultado)):
+            mascara = self._res_defectos[i]
+            ts = self._res_fecha[i]
+            if ts != ultimo_ts:
+                ultimo_ts = ts
+                fecha_texto = datetime.fromtimestamp(ts / 1e9).strftime('%Y-%m-%d %H:%M:%S')
+            partes.append(f"{i + 1}. Lote: {self._res_lote_id[i]} | "
+                          f"Proceso: {self._procesos[self._res_proceso[i]]} | "
+                          f"Resultado: {_VALOR_ESTADO[self._res_resultado[i]]}\n")
+            if mascara:
+                partes.append(f"   Defectos: {_TEXTO_DEFECTOS[mascara]}\n")
+            partes.append(f"   Fecha: {fecha_texto}\n")
+            partes.append(separador)
         
-        return reporte
+        return "".join(partes)
 
 # Función para mostrar el menú principal
 def mostrar_menu():
@@ -253,21 +386,138 @@ def obtener_opcion():
         print("Error: Por favor ingrese un número válido.")
         return -1
 
+# Núcleo compilado para la simulación en lote (requiere numba o la extensión tb1_ext)
+def _simulate_batch_kernel(n, bits_mold, max_mold, reject_mold, bits_emp, max_emp, reject_emp):
+    """Genera y evalúa las máscaras de defectos de n chocolates (moldeado + empaque)"""
+    masks_m = np.zeros(n, np.uint8)
+    masks_e = np.zeros(n, np.uint8)
+    for i in range(n):
+        for _ in range(np.random.randint(0, max_mold + 1)):
+            masks_m[i] |= bits_mold[np.random.randint(0, len(bits_mold))]
+    approved_m = (masks_m & reject_mold) == 0
+    # Solo los aprobados en moldeado pasan a empaque
+    for i in range(n):
+        if approved_m[i]:
+            for _ in range(np.random.randint(0, max_emp + 1)):
+                masks_e[i] |= bits_emp[np.random.randint(0, len(bits_emp))]
+    approved_e = approved_m & ((masks_e & reject_emp) == 0)
+    return masks_m, masks_e, approved_m, approved_e
+
+def _kernel_version() -> int:
+    """Huella del código del núcleo, para comprobar que tb1_ext se generó a partir de él"""
+    # Importaciones locales: solo se necesitan si existe la extensión precompilada
+    import hashlib
+    import inspect
+    fuente = inspect.getsource(_simulate_batch_kernel)
+    return int(hashlib.sha256(fuente.encode("utf-8")).hexdigest()[:15], 16)
+
+# La versión precompilada (python build_tb1_ext.py) evita la espera del JIT al arrancar
+try:
+    import tb1_ext
+except ImportError:
+    tb1_ext = None
+
+if tb1_ext is not None:
+    try:
+        vigente = hasattr(tb1_ext, "kernel_version") and tb1_ext.kernel_version() == _kernel_version()
+    except OSError:
+        # Sin el código fuente (p. ej. solo el .pyc) no se puede verificar la extensión
+        vigente = False
+    if not vigente:
+        warnings.warn("tb1_ext no corresponde al núcleo actual de TB1 o no se pudo verificar; "
+                      "se ignora (vuelva a ejecutar build_tb1_ext.py)", RuntimeWarning)
+        tb1_ext = None
+
+if tb1_ext is not None:
+    _simulate_batch = tb1_ext.simulate_batch
+elif njit is not None:
+    try:
+        _simulate_batch = njit(cache=True, nogil=True)(_simulate_batch_kernel)
+    except RuntimeError:
+        # Sin el archivo fuente numba no puede guardar la caché en disco
+        _simulate_batch = njit(nogil=True)(_simulate_batch_kernel)
+else:
+    _simulate_batch = None
+
 # Función para simular producción en lote
 def simular_produccion_lote(sistema: SistemaControlCalidad, cantidad: int):
     """Simula la producción y control de calidad de múltiples chocolates"""
     print(f"\nSimulando producción de {cantidad} chocolates...")
     
+    # Una sola lectura del reloj para todo el lote
+    ts = time.time_ns()
+    
+    sensor_molde = sistema.obtener_sensor("moldeado")
+    sensor_empaque = sistema.obtener_sensor("empaque")
+    # El núcleo compilado reproduce solo el análisis de SensorVisual (no el de subclases)
+    if _simulate_batch is not None and type(sensor_molde) is type(sensor_empaque) is SensorVisual:
+        lote = _simulate_batch(cantidad,
+                               SensorVisual._BITS_MOLDEADO, SensorVisual._MAX_DEFECTOS_MOLDEADO,
+                               ChocolateMoldeado.REJECT_MASK,
+                               SensorVisual._BITS_EMPAQUE, SensorVisual._MAX_DEFECTOS_EMPAQUE,
+                               ChocolateEmpaque.REJECT_MASK)
+    else:
+        lote = _simular_lote_sensores(sensor_molde, sensor_empaque, cantidad)
+    
+    if lote is None:
+        _simular_produccion_unitaria(sistema, cantidad, ts)
+        return
+    
+    masks_m, masks_e, approved_m, approved_e = lote
+    
+    lote_ids = []
+    for i in range(cantidad):
+        lote_ids.append(f"LOTE-M-{i+1}")
+        if approved_m[i]:
+            lote_ids.append(f"LOTE-E-{i+1}")
+            print(f"  Moldeado LOTE-M-{i+1}: {APROBADO_STR}")
+            print(f"  Empaque LOTE-E-{i+1}: {APROBADO_STR if approved_e[i] else RECHAZADO_STR}")
+        else:
+            print(f"  Moldeado LOTE-M-{i+1}: {RECHAZADO_STR}")
+            print(f"  ❌ Chocolate LOTE-M-{i+1} rechazado en moldeado")
+    
+    # Registrar en orden de producción: M-i seguido de E-i si pasó moldeado
+    fila_valida = np.column_stack((np.ones(cantidad, dtype=bool), approved_m)).ravel()
+    grupo = np.tile(np.array([0, 1], dtype=np.uint8), cantidad)[fila_valida]
+    sistema._registrar_resultados_bulk(
+        lote_ids,
+        ["moldeado", "empaque"],
+        grupo,
+        np.column_stack((masks_m, masks_e)).ravel()[fila_valida],
+        np.column_stack((approved_m, approved_e)).ravel()[fila_valida],
+        ts)
+
+def _simular_lote_sensores(sensor_molde: SensorCalidad, sensor_empaque: SensorCalidad, cantidad: int):
+    """Simulación vectorizada con la detección en lote de los sensores registrados"""
+    if np is None:
+        return None
+    
+    masks_m = sensor_molde.detectar_defectos_batch(ChocolateMoldeado, cantidad)
+    if masks_m is None:
+        return None
+    approved_m = (masks_m & ChocolateMoldeado.REJECT_MASK) == 0
+    # Solo los aprobados en moldeado pasan a empaque
+    masks_e_aprobados = sensor_empaque.detectar_defectos_batch(ChocolateEmpaque, int(approved_m.sum()))
+    if masks_e_aprobados is None:
+        return None
+    masks_e = np.zeros_like(masks_m)
+    masks_e[approved_m] = masks_e_aprobados
+    approved_e = approved_m & ((masks_e & ChocolateEmpaque.REJECT_MASK) == 0)
+    return masks_m, masks_e, approved_m, approved_e
+
+def _simular_produccion_unitaria(sistema: SistemaControlCalidad, cantidad: int, ts: int):
+    """Simulación chocolate por chocolate, usada cuando no hay detección en lote disponible"""
+    fecha = datetime.fromtimestamp(ts / 1e9)
     for i in range(cantidad):
         # Crear chocolate para moldeado
-        chocolate_molde = ChocolateMoldeado(f"LOTE-M-{i+1}", datetime.now(), "corazon")
-        resultado_molde = sistema.inspeccionar_chocolate(chocolate_molde, "moldeado")
+        chocolate_molde = ChocolateMoldeado(f"LOTE-M-{i+1}", fecha, "corazon")
+        resultado_molde = sistema.inspeccionar_chocolate(chocolate_molde, "moldeado", ts)
         print(f"  Moldeado {chocolate_molde.lote_id}: {resultado_molde.value}")
         
         # Si pasa moldeado, proceder a empaque
-        if resultado_molde == EstadoCalidad.APROBADO:
-            chocolate_empaque = ChocolateEmpaque(f"LOTE-E-{i+1}", datetime.now(), "caja_regalo")
-            resultado_empaque = sistema.inspeccionar_chocolate(chocolate_empaque, "empaque")
+        if resultado_molde is EstadoCalidad.APROBADO:
+            chocolate_empaque = ChocolateEmpaque(f"LOTE-E-{i+1}", fecha, "caja_regalo")
+            resultado_empaque = sistema.inspeccionar_chocolate(chocolate_empaque, "empaque", ts)
             print(f"  Empaque {chocolate_empaque.lote_id}: {resultado_empaque.value}")
         else:
             print(f"  ❌ Chocolate {chocolate_molde.lote_id} rechazado en moldeado")
@@ -296,7 +546,7 @@ def main():
             resultado = sistema.inspeccionar_chocolate(chocolate, "moldeado")
             print(f"\n✅ Resultado: {resultado.value}")
             if chocolate.defectos:
-                print(f"❌ Defectos detectados: {[d.value for d in chocolate.defectos]}")
+                print(f"❌ Defectos detectados: {[d.descripcion for d in chocolate.defectos_list()]}")
         
         elif opcion == 2:
             # Inspeccionar chocolate de empaque
@@ -305,7 +555,7 @@ def main():
             resultado = sistema.inspeccionar_chocolate(chocolate, "empaque")
             print(f"\n✅ Resultado: {resultado.value}")
             if chocolate.defectos:
-                print(f"❌ Defectos detectados: {[d.value for d in chocolate.defectos]}")
+                print(f"❌ Defectos detectados: {[d.descripcion for d in chocolate.defectos_list()]}")
         
         elif opcion == 3:
             # Proceso completo
@@ -316,13 +566,13 @@ def main():
             resultado_molde = sistema.inspeccionar_chocolate(chocolate_molde, "moldeado")
             print(f"\n🔧 Moldeado: {resultado_molde.value}")
             
-            if resultado_molde == EstadoCalidad.APROBADO:
+            if resultado_molde is EstadoCalidad.APROBADO:
                 # Empaque
                 chocolate_empaque = ChocolateEmpaque(f"{lote_id}-E", datetime.now(), "caja_regalo")
                 resultado_empaque = sistema.inspeccionar_chocolate(chocolate_empaque, "empaque")
                 print(f"📦 Empaque: {resultado_empaque.value}")
                 
-                if resultado_empaque == EstadoCalidad.APROBADO:
+                if resultado_empaque is EstadoCalidad.APROBADO:
                     print("🎉 ¡Producto final APROBADO!")
                 else:
                     print("❌ Producto rechazado en empaque")
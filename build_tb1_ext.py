@@ -0,0 +1,31 @@
+"""Compilación anticipada (AOT) del núcleo de simulación en lote de TB1
+
+Genera la extensión tb1_ext junto a TB1.py; si está presente y su
+kernel_version() coincide con TB1._kernel_version(), TB1 la usa en lugar de
+compilar el núcleo con el JIT de numba en cada ejecución.
+
+Es una optimización opcional y sin garantías: numba.pycc está en desuso
+(NumbaPendingDeprecationWarning) y puede desaparecer en versiones futuras.
+
+Uso: python build_tb1_ext.py
+"""
+import os
+
+from numba.pycc import CC
+
+import TB1
+
+cc = CC('tb1_ext')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+_KERNEL_VERSION = TB1._kernel_version()
+
+@cc.export('kernel_version', 'i8()')
+def kernel_version():
+    """Huella del núcleo con el que se generó la extensión"""
+    return _KERNEL_VERSION
+
+cc.export('simulate_batch', 'Tuple((u1[:], u1[:], b1[:], b1[:]))(i8, u1[:], i8, u1, u1[:], i8, u1)')(TB1._simulate_batch_kernel)
+
+if __name__ == "__main__":
+    cc.compile()